@@ -11,34 +11,108 @@ bl_info = {
 import bpy
 import gpu
 from gpu_extras.batch import batch_for_shader
-from mathutils import Vector
-from math import inf
-import time
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # optional, not bundled with Blender
+    njit = None
 
 # In-session state
 _state_per_area = {}    # area_ptr -> {"enabled": bool, "prev_overlay": bool, "prev_shading": bool, "saved": bool}
 _state_per_screen = {}  # screen_ptr -> {"prev_overlay": bool, "saved": bool}
 
-# Cache
-_cache = {
-    "dg_version": -1,
-    "selected_key": None,
-    "xform_key": None,
-    "prefs_sig": None,
-    "aabbs": {},         # owner_ptr -> (mn, mx)
+# Cache, one per view layer shown in a window (see _get_cache)
+_caches = {}  # view_layer_ptr -> {"dg_version", "aabbs", "draw", ...}
+_scratch = {             # buffers reused across recomputes (see _scratch_bounds / _scratch_chunk)
+    "mn": np.empty((0, 3), dtype=np.float32),
+    "mx": np.empty((0, 3), dtype=np.float32),
+    "chunk": None,
 }
 _dg_version = 0
-_last_update_time = 0.0  # throttling gate (Object Mode only)
+
+# Theme colors / line width, read once and invalidated through msgbus
+_theme_cache = {"valid": False, "active": None, "selected": None, "width": 2.8}
+_theme_owner = object()
+_THEME_KEYS = (
+    ("ThemeView3D", "object_active"),
+    ("ThemeView3D", "object_selected"),
+    ("PreferencesView", "ui_line_width"),
+)
 
 _draw_handle = None
 _overlay_targets = []
 
 # Static box edges
-_BOX_EDGES = (
+_BOX_EDGES = np.array((
     (0, 1), (1, 2), (2, 3), (3, 0),
     (4, 5), (5, 6), (6, 7), (7, 4),
     (0, 4), (1, 5), (2, 6), (3, 7),
-)
+), dtype=np.int32)
+# Corner i of a box as a 0/1 mask between mn and mx (matches the corner order above)
+_CORNER_MASK = np.array((
+    (0, 0, 0), (1, 0, 0), (1, 1, 0), (0, 1, 0),
+    (0, 0, 1), (1, 0, 1), (1, 1, 1), (0, 1, 1),
+), dtype=np.float32)
+
+# Two triangles per edge: (endpoint 0/1, side -1/+1)
+_EDGE_QUAD = np.array((
+    (0, -1), (1, -1), (1, 1),
+    (0, -1), (1, 1), (0, 1),
+), dtype=np.float32)
+
+# Instanced box shader: one static template of 12 edge quads, per-box (mn, mx, color)
+# read from a float texture (3 texels per box) by gl_InstanceID. Edges are expanded
+# to LINE_WIDTH * pixel_size pixels in screen space (pixel_size is the UI scale that
+# gpu.state.line_width_set applies), so no line_width_set is needed.
+_LINE_WIDTHS = (2.0, 2.8, 3.6)  # _outline_like_width presets, one shader variant each
+_BOX_TEX_COLS = 1024  # boxes per texture row
+_BOX_VERT_SRC = """
+void main()
+{
+    int x = (gl_InstanceID % box_cols) * 3;
+    int y = gl_InstanceID / box_cols;
+    vec3 box_min = texelFetch(box_data, ivec2(x, y), 0).xyz;
+    vec3 box_max = texelFetch(box_data, ivec2(x + 1, y), 0).xyz;
+    box_color = texelFetch(box_data, ivec2(x + 2, y), 0);
+
+    vec4 pa = viewProjectionMatrix * vec4(mix(box_min, box_max, edge_a), 1.0);
+    vec4 pb = viewProjectionMatrix * vec4(mix(box_min, box_max, edge_b), 1.0);
+
+    /* Clip the segment against the near plane (z >= -w) before the divide by w,
+     * otherwise endpoints behind the camera flip and smear across the screen. */
+    float da = pa.z + pa.w;
+    float db = pb.z + pb.w;
+    if (da < 0.0 && db < 0.0) {
+        gl_Position = vec4(0.0, 0.0, 2.0, 1.0); /* Whole edge behind: outside the clip volume. */
+        return;
+    }
+    if (da < 0.0) {
+        pa = mix(pa, pb, da / (da - db));
+    }
+    else if (db < 0.0) {
+        pb = mix(pb, pa, db / (db - da));
+    }
+
+    vec2 dir = pb.xy / pb.w * viewport_size - pa.xy / pa.w * viewport_size;
+    float len = length(dir);
+    dir = (len > 1e-6) ? dir / len : vec2(1.0, 0.0);
+    vec2 normal = vec2(-dir.y, dir.x);
+
+    /* Offset in NDC: half the scaled width to each side, plus a half-width cap so corners meet. */
+    vec4 p = (edge_corner.x < 0.5) ? pa : pb;
+    vec2 offset = normal * edge_corner.y + dir * (edge_corner.x * 2.0 - 1.0);
+    p.xy += offset * (LINE_WIDTH * pixel_size / viewport_size) * p.w;
+    gl_Position = p;
+}
+"""
+_BOX_FRAG_SRC = """
+void main()
+{
+    fragColor = box_color;
+}
+"""
+_box_gpu = {"flat": None, "shaders": {}, "template": None, "failed": False}
 
 # -------------------- Preferences --------------------
 
@@ -107,6 +181,7 @@ class BBSEL_AddonPreferences(bpy.types.AddonPreferences):
 
 def _area_key(area): return int(area.as_pointer()) if area else 0
 def _screen_key(screen): return int(screen.as_pointer()) if screen else 0
+def _view_layer_key(view_layer): return int(view_layer.as_pointer()) if view_layer else 0
 
 def _get_state(area):
     return _state_per_area.setdefault(
@@ -114,6 +189,29 @@ def _get_state(area):
         {"enabled": False, "prev_overlay": True, "prev_shading": True, "saved": False}
     )
 
+def _get_cache(view_layer):
+    # Windows can show different scenes / view layers, each with its own selection and depsgraph
+    return _caches.setdefault(
+        _view_layer_key(view_layer),
+        {
+            "dg_version": -1,
+            "prefs_sig": None,
+            "aabbs": None,       # (owner_ptrs int64[K], mn f32[K,3], mx f32[K,3]) or None
+            "active_ptr": None,  # evaluated active object
+            "active_key": None,  # (active_obj_ptr, dg_version) of "active_ptr"
+            "colors": None,      # (active_color, selected_color)
+            "draw": None,        # GPU data built from the above (see _build_draw)
+            "draw_src": None,    # (aabbs, active_ptr, colors) the GPU data was built from
+            "selected_eval_key": None,  # dg_version of "selected_eval"
+            "selected_eval": set(),
+            "corners": {},       # stable object ptr (see _corner_key) -> (8,4) f32 homogeneous local bound_box corners
+        }
+    )
+
+def _clear_corner_caches():
+    for cache in _caches.values():
+        cache["corners"].clear()
+
 def _get_screen_state(screen):
     return _state_per_screen.setdefault(
         _screen_key(screen),
@@ -188,18 +286,19 @@ def _apply_everywhere(enabled):
     except Exception:
         pass
 
-def _theme_colors(context):
+def _read_theme_colors(context):
     try:
         tv = context.preferences.themes[0].view_3d
         active = getattr(tv, "object_active", (1.0, 0.5, 0.0))
         selected = getattr(tv, "object_selected", (1.0, 1.0, 0.0))
     except Exception:
         active, selected = (1.0, 0.5, 0.0), (1.0, 1.0, 0.0)
+    active, selected = tuple(active), tuple(selected)
     if len(active) == 3: active = (*active, 1.0)
     if len(selected) == 3: selected = (*selected, 1.0)
     return active, selected
 
-def _outline_like_width(context):
+def _read_outline_width(context):
     try:
         w = context.preferences.view.ui_line_width  # THIN/AUTO/THICK
         if w == 'THIN':  return 2.0
@@ -208,31 +307,45 @@ def _outline_like_width(context):
     except Exception:
         return 2.8
 
-def _selected_eval_set(context, depsgraph):
-    # Faster than scanning the whole view layer
-    return {
-        ob.evaluated_get(depsgraph)
-        for ob in context.selected_objects
-        if ob.visible_get()
-    }
+def _invalidate_theme(*_args):
+    _theme_cache["valid"] = False
 
-def _selected_key(selected_set):
-    return tuple(sorted(int(o.as_pointer()) for o in selected_set))
-
-def _xform_key(selected_set):
-    # Lightweight transform signature (quantized matrices)
-    parts = []
-    for ob in sorted(selected_set, key=lambda o: o.as_pointer()):
-        mw = ob.matrix_world
-        vals = (
-            mw[0][0], mw[0][1], mw[0][2],
-            mw[1][0], mw[1][1], mw[1][2],
-            mw[2][0], mw[2][1], mw[2][2],
-            mw[0][3], mw[1][3], mw[2][3],
-        )
-        q = tuple(int(v * 1e6) for v in vals)
-        parts.append((int(ob.as_pointer()),) + q)
-    return tuple(parts)
+def _subscribe_theme():
+    # Subscriptions are dropped on file load, so this also runs from _load_post
+    bpy.msgbus.clear_by_owner(_theme_owner)
+    for type_name, prop in _THEME_KEYS:
+        try:
+            bpy.msgbus.subscribe_rna(
+                key=(getattr(bpy.types, type_name), prop),
+                owner=_theme_owner,
+                args=(),
+                notify=_invalidate_theme,
+            )
+        except Exception:
+            pass
+    _invalidate_theme()
+
+def _theme(context):
+    if not _theme_cache["valid"]:
+        _theme_cache["active"], _theme_cache["selected"] = _read_theme_colors(context)
+        _theme_cache["width"] = _read_outline_width(context)
+        _theme_cache["valid"] = True
+    return _theme_cache
+
+def _theme_colors(context):
+    tc = _theme(context)
+    return tc["active"], tc["selected"]
+
+def _outline_like_width(context):
+    return _theme(context)["width"]
+
+def _selected_eval_set(context, depsgraph, cache):
+    # Faster than scanning the whole view layer; reused until the next depsgraph update
+    if cache["selected_eval_key"] != _dg_version:
+        dg_eval = depsgraph.id_eval_get
+        cache["selected_eval"] = {dg_eval(ob) for ob in context.selected_objects if ob.visible_get()}
+        cache["selected_eval_key"] = _dg_version
+    return cache["selected_eval"]
 
 def _is_enabled_anywhere():
     p = _prefs()
@@ -255,136 +368,410 @@ def _tag_redraw_all_3d_views():
         pass
 
 
-# -------------------- AABB collection (Object Mode only, throttled) --------------------
-
-def _collect_aabbs_cached(context, depsgraph):
-    global _cache, _last_update_time
-
+# -------------------- AABB collection (Object Mode only, timer driven) --------------------
+
+_F32_MAX = float(np.finfo(np.float32).max)  # "empty" sentinel, keeps fastmath valid (no inf)
+
+def _local_corners(ob):
+    bb = getattr(ob, "bound_box", None)
+    if not bb:
+        return None
+    corners_h = np.ones((8, 4), dtype=np.float32)
+    corners_h[:, :3] = bb
+    return corners_h
+
+def _data_ptr(ob):
+    data = getattr(ob, "data", None)
+    return int(data.as_pointer()) if data else 0
+
+def _corner_key(inst, base, is_instance):
+    # Stable key for the local bounds of this hit, or None if there is none.
+    # Non-instances are real evaluated objects. All duplis share one temporary
+    # object, so key by the instanced object, and only when the dupli carries
+    # that object's own data (GN geometry instances carry other data).
+    if not is_instance:
+        return int(base.as_pointer())
+    src = getattr(inst, "instance_object", None)
+    if src is None or _data_ptr(base) != _data_ptr(src):
+        return None
+    return int(src.as_pointer())
+
+def _scratch_bounds(k):
+    # (mn, mx) views with k rows; grows with headroom, shrinks only when grossly oversized
+    cap = len(_scratch["mn"])
+    if k > cap or cap > 8 * max(k, 64):
+        cap = max(64, 2 * k)
+        _scratch["mn"] = np.empty((cap, 3), dtype=np.float32)
+        _scratch["mx"] = np.empty((cap, 3), dtype=np.float32)
+    return _scratch["mn"][:k], _scratch["mx"][:k]
+
+_CHUNK_ROWS = 65536  # kept hits per _accumulate call, bounds memory for huge instance counts
+
+def _scratch_chunk():
+    # (mats (C,4,4) f32, owner rows (C,), base rows (C,)) filled by one recompute, then reused
+    if _scratch["chunk"] is None:
+        _scratch["chunk"] = (
+            np.empty((_CHUNK_ROWS, 4, 4), dtype=np.float32),
+            np.empty(_CHUNK_ROWS, dtype=np.int64),
+            np.empty(_CHUNK_ROWS, dtype=np.int64),
+        )
+    return _scratch["chunk"]
+
+def _accumulate_np(mats, corners, base_ids, owner_ids, mn, mx):
+    # mats (N,4,4), corners (B,8,4) homogeneous per base, base_ids/owner_ids (N,);
+    # folds per-owner bounds into mn/mx (K,3). Owners may span several runs, but
+    # long runs (one owner's instances in a row) reduce best.
+    world = np.einsum('nij,nkj->nki', mats, corners[base_ids])[..., :3]
+    starts = np.flatnonzero(np.r_[True, owner_ids[1:] != owner_ids[:-1]])
+
+    np.minimum.at(mn, owner_ids[starts], np.minimum.reduceat(np.minimum.reduce(world, axis=1), starts))
+    np.maximum.at(mx, owner_ids[starts], np.maximum.reduceat(np.maximum.reduce(world, axis=1), starts))
+
+def _accumulate_jit(mats, corners, base_ids, owner_ids, mn, mx):
+    # Same contract as _accumulate_np, written as plain loops for numba: each owner
+    # run is reduced in locals and folded into mn/mx once
+    n_inst = owner_ids.shape[0]
+    start = 0
+    while start < n_inst:
+        o = owner_ids[start]
+        x0 = y0 = z0 = _F32_MAX
+        x1 = y1 = z1 = -_F32_MAX
+        end = start
+        while end < n_inst and owner_ids[end] == o:
+            m = mats[end]
+            c = corners[base_ids[end]]
+            for k in range(8):
+                x = c[k, 0]
+                y = c[k, 1]
+                z = c[k, 2]
+                wx = m[0, 0] * x + m[0, 1] * y + m[0, 2] * z + m[0, 3]
+                wy = m[1, 0] * x + m[1, 1] * y + m[1, 2] * z + m[1, 3]
+                wz = m[2, 0] * x + m[2, 1] * y + m[2, 2] * z + m[2, 3]
+                x0 = min(x0, wx)  # branchless minss/maxss
+                y0 = min(y0, wy)
+                z0 = min(z0, wz)
+                x1 = max(x1, wx)
+                y1 = max(y1, wy)
+                z1 = max(z1, wz)
+            end += 1
+        mn[o, 0] = min(mn[o, 0], x0)
+        mn[o, 1] = min(mn[o, 1], y0)
+        mn[o, 2] = min(mn[o, 2], z0)
+        mx[o, 0] = max(mx[o, 0], x1)
+        mx[o, 1] = max(mx[o, 1], y1)
+        mx[o, 2] = max(mx[o, 2], z1)
+        start = end
+
+# Compiled once and cached on disk when numba is installed
+_accumulate = njit(cache=True, fastmath=True)(_accumulate_jit) if njit else _accumulate_np
+
+def _collect_aabbs_cached(context, cache):
     # Skip completely in Edit Mode
     if context.mode.startswith("EDIT"):
-        return {}
-
-    selected_eval = _selected_eval_set(context, depsgraph)
-    if not selected_eval:
-        return {}
+        return None
 
+    # Boxes are world-space, so redraws without a depsgraph update (camera
+    # orbit, overlay redraws) reuse the cache
     p = _prefs()
     psig = _prefs_sig(p)
-    sel_key = _selected_key(selected_eval)
-    xf_key = _xform_key(selected_eval)
-
-    changed_dg   = (_cache["dg_version"] != _dg_version)
-    changed_sel  = (_cache["selected_key"] != sel_key)
-    changed_xf   = (_cache["xform_key"] != xf_key)
-    changed_pref = (_cache["prefs_sig"] != psig)
-
-    needs_recompute = changed_dg or changed_sel or changed_xf or changed_pref
+    if cache["dg_version"] == _dg_version and cache["prefs_sig"] == psig:
+        return cache["aabbs"]
 
-    now = time.monotonic()
-    if not needs_recompute or (now - _last_update_time) < _interval():
-        return _cache["aabbs"]
+    depsgraph = context.evaluated_depsgraph_get()
+    selected_eval = _selected_eval_set(context, depsgraph, cache)
+    if not selected_eval:
+        _store_aabbs(cache, psig, None)
+        return None
 
     # Recompute AABBs (with optional sampling / early-exit)
     mode, auto_threshold, sample_limit = psig
     sampling = (mode == 'SAMPLED')
     total_hits = 0
     owners_done = 0
-    owners_needed = len(selected_eval)
-
-    owners = {owner: {"mn": [inf, inf, inf], "mx": [-inf, -inf, -inf], "count": 0, "done": False}
-              for owner in selected_eval}
-
+    owner_list = sorted(selected_eval, key=lambda o: o.as_pointer())
+    owners_needed = len(owner_list)
+    sel_ptrs = np.array([o.as_pointer() for o in owner_list], dtype=np.int64)
+    owner_row = {ptr: row for row, ptr in enumerate(sel_ptrs.tolist())}
+    counts = [0] * owners_needed
+    done = [False] * owners_needed
+
+    # Single pass. Items (and the temporary dupli objects they point to) die with
+    # the iterator, so keep only ints/arrays; matrix_world is read for kept hits only.
+    # Kept hits fill a fixed-size chunk that is folded into mn/mx whenever it is full.
+    mn_all, mx_all = _scratch_bounds(owners_needed)
+    mn_all.fill(_F32_MAX)
+    mx_all.fill(-_F32_MAX)
+    mats, rows, base_ids = _scratch_chunk()
+    n = 0
+    corner_cache = cache["corners"]
+    used_keys = set()
+    base_row, base_corners = {}, []  # per chunk
     for inst in depsgraph.object_instances:
         base = inst.object or getattr(inst, "instance_object", None)
         if base is None:
             continue
 
-        owner = inst.parent if getattr(inst, "is_instance", False) else inst.object
+        flag = getattr(inst, "is_instance", False)
+        owner = inst.parent if flag else inst.object
         if owner is None:
             owner = getattr(inst, "instance_parent", None)
-
-        st = owners.get(owner)
-        if st is None:
+        if owner is None:
+            continue
+        row = owner_row.get(owner.as_pointer())
+        if row is None:
             continue
 
         if mode == 'AUTO' and not sampling and total_hits >= auto_threshold:
             sampling = True
-        if sampling and st["done"]:
+        if sampling and done[row]:
             if owners_done >= owners_needed:
                 break
             continue
 
-        bb = getattr(base, "bound_box", None)
-        if not bb:
+        key = _corner_key(inst, base, flag)
+        brow = base_row.get(key) if key is not None else None
+        if brow is None:
+            corners_h = corner_cache.get(key) if key is not None else None
+            if corners_h is None:
+                corners_h = _local_corners(base)
+                if corners_h is not None and key is not None:
+                    corner_cache[key] = corners_h
+            if corners_h is None:
+                brow = -1  # no bound_box
+            else:
+                brow = len(base_corners)
+                base_corners.append(corners_h)
+            if key is not None:
+                base_row[key] = brow
+                used_keys.add(key)
+        if brow < 0:
             continue
 
-        mw = inst.matrix_world
-        mn, mx = st["mn"], st["mx"]
-        for c in bb:
-            w = mw @ Vector(c)
-            x, y, z = w.x, w.y, w.z
-            if x < mn[0]: mn[0] = x
-            if y < mn[1]: mn[1] = y
-            if z < mn[2]: mn[2] = z
-            if x > mx[0]: mx[0] = x
-            if y > mx[1]: mx[1] = y
-            if z > mx[2]: mx[2] = z
-
-        st["count"] += 1
+        mats[n] = inst.matrix_world
+        rows[n] = row
+        base_ids[n] = brow
+        n += 1
+        if n == _CHUNK_ROWS:
+            _accumulate(mats, np.stack(base_corners), base_ids, rows, mn_all, mx_all)
+            n = 0
+            base_row, base_corners = {}, []
+
+        counts[row] += 1
         total_hits += 1
 
-        if sampling and st["count"] >= sample_limit:
-            st["done"] = True
+        if sampling and counts[row] >= sample_limit:
+            done[row] = True
             owners_done += 1
             if owners_done >= owners_needed:
                 break
 
-    result = {}
-    for owner, st in owners.items():
-        mn, mx = st["mn"], st["mx"]
-        if any(v == inf for v in mn) or any(v == -inf for v in mx):
-            continue
-        result[int(owner.as_pointer())] = (mn, mx)
-
-    # Update cache
-    _cache["dg_version"] = _dg_version
-    _cache["selected_key"] = sel_key
-    _cache["xform_key"] = xf_key
-    _cache["prefs_sig"] = psig
-    _cache["aabbs"] = result
-    _last_update_time = now
+    if n:
+        _accumulate(mats[:n], np.stack(base_corners), base_ids[:n], rows[:n], mn_all, mx_all)
+
+    result = None
+    valid = mn_all[:, 0] <= mx_all[:, 0]
+    if valid.any():
+        # Boolean indexing copies, so the scratch rows are free for the next recompute
+        result = (sel_ptrs[valid], mn_all[valid], mx_all[valid])
+
+    # Forget bases that no longer feed any selected owner
+    for key in [k for k in corner_cache if k not in used_keys]:
+        del corner_cache[key]
+
+    _store_aabbs(cache, psig, result)
     return result
 
+def _store_aabbs(cache, psig, aabbs):
+    cache["dg_version"] = _dg_version
+    cache["prefs_sig"] = psig
+    cache["aabbs"] = aabbs
+
+def _active_eval_ptr(context, cache):
+    # Reused while neither the active object nor the depsgraph changed
+    active_obj = context.view_layer.objects.active
+    if active_obj is None:
+        cache["active_key"] = None
+        return None
+    key = (int(active_obj.as_pointer()), _dg_version)
+    if cache["active_key"] != key:
+        dg_eval = context.evaluated_depsgraph_get().id_eval_get
+        cache["active_ptr"] = int(dg_eval(active_obj).as_pointer())
+        cache["active_key"] = key
+    return cache["active_ptr"]
+
+def _refresh_cache(context, cache):
+    # Recompute boxes / active object / colors; True if anything drawn changed
+    prev = (cache["aabbs"], cache["active_ptr"], cache["colors"])
+    cache["colors"] = _theme_colors(context)
+
+    _collect_aabbs_cached(context, cache)
+    cache["active_ptr"] = _active_eval_ptr(context, cache)
+
+    return (cache["aabbs"] is not prev[0] or cache["active_ptr"] != prev[1]
+            or cache["colors"] != prev[2])
+
+def _bbsel_tick():
+    # Timer: keeps the cache of every view layer shown in a window current off
+    # the draw path, redraws only on change
+    try:
+        if _is_enabled_anywhere():
+            changed = False
+            live = set()
+            for win in bpy.context.window_manager.windows:
+                key = _view_layer_key(win.view_layer)
+                if key in live:
+                    continue
+                live.add(key)
+                # Window context, so selection / mode / depsgraph are this view layer's
+                with bpy.context.temp_override(window=win):
+                    changed |= _refresh_cache(bpy.context, _get_cache(win.view_layer))
+            # View layers no longer shown anywhere
+            for key in [k for k in _caches if k not in live]:
+                del _caches[key]
+            if changed:
+                _tag_redraw_all_3d_views()
+    except Exception:
+        pass
+    return _interval()
+
+
+# -------------------- Draw callback (single instanced draw) --------------------
+
+def _create_box_shaders():
+    shaders = {}
+    for width in _LINE_WIDTHS:
+        iface = gpu.types.GPUStageInterfaceInfo("bbsel_iface")
+        iface.flat('VEC4', "box_color")
+
+        info = gpu.types.GPUShaderCreateInfo()
+        info.define("LINE_WIDTH", repr(width))
+        info.push_constant('MAT4', "viewProjectionMatrix")
+        info.push_constant('VEC2', "viewport_size")
+        info.push_constant('FLOAT', "pixel_size")
+        info.push_constant('INT', "box_cols")
+        info.sampler(0, 'FLOAT_2D', "box_data")
+        info.vertex_in(0, 'VEC3', "edge_a")
+        info.vertex_in(1, 'VEC3', "edge_b")
+        info.vertex_in(2, 'VEC2', "edge_corner")
+        info.vertex_out(iface)
+        info.fragment_out(0, 'VEC4', "fragColor")
+        info.vertex_source(_BOX_VERT_SRC)
+        info.fragment_source(_BOX_FRAG_SRC)
+        shaders[width] = gpu.shader.create_from_info(info)
+
+    # All variants share the vertex inputs, so one template batch serves them all
+    n = len(_EDGE_QUAD)
+    _box_gpu["template"] = batch_for_shader(shaders[_LINE_WIDTHS[0]], 'TRIS', {
+        "edge_a": np.repeat(_CORNER_MASK[_BOX_EDGES[:, 0]], n, axis=0),
+        "edge_b": np.repeat(_CORNER_MASK[_BOX_EDGES[:, 1]], n, axis=0),
+        "edge_corner": np.tile(_EDGE_QUAD, (len(_BOX_EDGES), 1)),
+    })
+    _box_gpu["shaders"] = shaders
+
+def _box_shaders():
+    # Width -> instanced shader variant; empty if unsupported on this GPU backend
+    if not _box_gpu["shaders"] and not _box_gpu["failed"]:
+        try:
+            _create_box_shaders()
+        except Exception:
+            _box_gpu["failed"] = True
+    return _box_gpu["shaders"]
 
-# -------------------- Draw callback (batched draws) --------------------
+def _flat_shader():
+    if _box_gpu["flat"] is None:
+        _box_gpu["flat"] = gpu.shader.from_builtin('3D_FLAT_COLOR')
+    return _box_gpu["flat"]
 
-def _build_batches(aabbs, active_eval_ptr):
+def _init_shaders():
+    # Created once at register; if no GPU context exists yet the getters above create them on first draw
+    if bpy.app.background:
+        return
+    try:
+        _flat_shader()
+        _create_box_shaders()
+    except Exception:
+        pass
+
+def _box_colors(owner_ptrs, active_eval_ptr, active_color, selected_color):
+    is_active = owner_ptrs == (active_eval_ptr or 0)
+    return np.where(
+        is_active[:, None],
+        np.asarray(active_color, dtype=np.float32),
+        np.asarray(selected_color, dtype=np.float32),
+    )
+
+def _float_buffer(arr):
+    # gpu.types.Buffer over a float32 array; copies through a list only on builds without buffer-protocol support
+    flat = np.ascontiguousarray(arr, dtype=np.float32).reshape(-1)
+    try:
+        return gpu.types.Buffer('FLOAT', flat.shape, flat)
+    except TypeError:
+        return gpu.types.Buffer('FLOAT', flat.size, flat.tolist())
+
+def _build_box_texture(aabbs, active_eval_ptr, active_color, selected_color):
+    owner_ptrs, mn, mx = aabbs
+    n = len(owner_ptrs)
+    cols = min(n, _BOX_TEX_COLS)
+    rows = -(-n // cols)
+    data = np.zeros((rows * cols, 3, 4), dtype=np.float32)
+    data[:n, 0, :3] = mn
+    data[:n, 1, :3] = mx
+    data[:n, 2] = _box_colors(owner_ptrs, active_eval_ptr, active_color, selected_color)
+    tex = gpu.types.GPUTexture((cols * 3, rows), format='RGBA32F', data=_float_buffer(data))
+    return {"tex": tex, "cols": cols, "count": n}
+
+def _build_batch(aabbs, active_eval_ptr, active_color, selected_color):
+    # Fallback: one LINES batch for every box; active/selected differ only by per-vertex color
+    owner_ptrs, mn, mx = aabbs
+    n = len(owner_ptrs)
+    pos = np.empty((n, 8, 3), dtype=np.float32)
+    np.add(mn[:, None, :], (mx - mn)[:, None, :] * _CORNER_MASK, out=pos)
+    col = np.empty((n, 8, 4), dtype=np.float32)
+    col[:] = _box_colors(owner_ptrs, active_eval_ptr, active_color, selected_color)[:, None, :]
+    idx = np.arange(n, dtype=np.int32)[:, None, None] * 8 + _BOX_EDGES
+
+    # Explicit F32 format so the arrays are copied as-is (no f64 -> f32 conversion pass)
+    fmt = gpu.types.GPUVertFormat()
+    fmt.attr_add(id="pos", comp_type='F32', len=3, fetch_mode='FLOAT')
+    fmt.attr_add(id="color", comp_type='F32', len=4, fetch_mode='FLOAT')
+    vbo = gpu.types.GPUVertBuf(fmt, n * 8)
+    vbo.attr_fill("pos", pos.reshape(-1, 3))
+    vbo.attr_fill("color", col.reshape(-1, 4))
+    ibo = gpu.types.GPUIndexBuf(type='LINES', seq=idx.reshape(-1, 2))
+    return {"batch": gpu.types.GPUBatch(type='LINES', buf=vbo, elem=ibo)}
+
+def _build_draw(aabbs, active_eval_ptr, active_color, selected_color):
     if not aabbs:
-        return None, None
-
-    sel_pos, sel_idx = [], []
-    act_pos, act_idx = [], []
-
-    def add_box(target_pos, target_idx, mn, mx):
-        base = len(target_pos)
-        target_pos.extend((
-            (mn[0], mn[1], mn[2]), (mx[0], mn[1], mn[2]),
-            (mx[0], mx[1], mn[2]), (mn[0], mx[1], mn[2]),
-            (mn[0], mn[1], mx[2]), (mx[0], mn[1], mx[2]),
-            (mx[0], mx[1], mx[2]), (mn[0], mx[1], mx[2]),
-        ))
-        target_idx.extend(tuple((base + a, base + b) for (a, b) in _BOX_EDGES))
-
-    for owner_ptr, (mn, mx) in aabbs.items():
-        if active_eval_ptr and owner_ptr == active_eval_ptr:
-            add_box(act_pos, act_idx, mn, mx)
-        else:
-            add_box(sel_pos, sel_idx, mn, mx)
+        return None
+    if _box_shaders():
+        try:
+            return _build_box_texture(aabbs, active_eval_ptr, active_color, selected_color)
+        except Exception:
+            pass
+    return _build_batch(aabbs, active_eval_ptr, active_color, selected_color)
 
-    shader = gpu.shader.from_builtin('3D_UNIFORM_COLOR')
-    batch_sel = batch_for_shader(shader, 'LINES', {"pos": sel_pos}, indices=sel_idx) if sel_idx else None
-    batch_act = batch_for_shader(shader, 'LINES', {"pos": act_pos}, indices=act_idx) if act_idx else None
-    return batch_sel, batch_act
+def _draw_boxes(draw, width, pixel_size):
+    # Exactly one bind + one draw per call; active/selected colors are already in the data
+    if "tex" in draw:
+        shaders = _box_gpu["shaders"]
+        shader = shaders.get(width) or shaders[_LINE_WIDTHS[1]]
+        shader.bind()
+        shader.uniform_float(
+            "viewProjectionMatrix",
+            gpu.matrix.get_projection_matrix() @ gpu.matrix.get_model_view_matrix(),
+        )
+        shader.uniform_float("viewport_size", gpu.state.viewport_get()[2:])
+        shader.uniform_float("pixel_size", pixel_size)
+        shader.uniform_int("box_cols", draw["cols"])
+        shader.uniform_sampler("box_data", draw["tex"])
+        _box_gpu["template"].draw_instanced(shader, instance_count=draw["count"])
+    else:
+        try:
+            gpu.state.line_width_set(width)
+        except Exception:
+            pass
+        # No uniforms on this path; batch.draw binds the program itself
+        draw["batch"].draw(_flat_shader())
 
 def _draw_callback_3d():
     ctx = bpy.context
@@ -397,6 +784,21 @@ def _draw_callback_3d():
     if ctx.mode.startswith("EDIT"):
         return
 
+    # Filled by _bbsel_tick for every view layer shown in a window
+    cache = _caches.get(_view_layer_key(ctx.view_layer))
+    if cache is None:
+        return
+
+    # Common case: nothing selected (the timer stores no boxes), so skip prefs and
+    # GPU work without any RNA access
+    aabbs = cache["aabbs"]
+    if not aabbs:
+        if cache["draw"] is not None:
+            # Release GPU data once; a later selection rebuilds it
+            cache["draw"] = None
+            cache["draw_src"] = None
+        return
+
     p = _prefs()
     if p and p.use_all_views:
         if not bool(getattr(ctx.scene, "bbsel_enable_all", False)):
@@ -405,36 +807,21 @@ def _draw_callback_3d():
         if not _get_state(area).get("enabled"):
             return
 
-    depsgraph = ctx.evaluated_depsgraph_get()
-    active_color, selected_color = _theme_colors(ctx)
-    shader = gpu.shader.from_builtin('3D_UNIFORM_COLOR')
-
-    aabbs = _collect_aabbs_cached(ctx, depsgraph)
-    if not aabbs:
-        return
-
-    active_obj = ctx.view_layer.objects.active
-    active_eval_ptr = int(active_obj.evaluated_get(depsgraph).as_pointer()) if active_obj else None
-
-    batch_sel, batch_act = _build_batches(aabbs, active_eval_ptr)
-    if not batch_sel and not batch_act:
+    # Boxes are computed by _bbsel_tick; only (re)upload here, where a GPU context is guaranteed
+    src = (aabbs, cache["active_ptr"], cache["colors"])
+    prev = cache["draw_src"]
+    if prev is None or prev[0] is not aabbs or prev[1:] != src[1:]:
+        cache["draw"] = _build_draw(aabbs, src[1], *src[2])
+        cache["draw_src"] = src
+    draw = cache["draw"]
+    if not draw:
         return
 
     gpu.state.depth_test_set('LESS_EQUAL')  # occluded
     gpu.state.blend_set('ALPHA')
-    try:
-        gpu.state.line_width_set(_outline_like_width(ctx))
-    except Exception:
-        pass
 
-    if batch_sel:
-        shader.bind()
-        shader.uniform_float("color", selected_color)
-        batch_sel.draw(shader)
-    if batch_act:
-        shader.bind()
-        shader.uniform_float("color", active_color)
-        batch_act.draw(shader)
+    # line_width_set scales by the UI pixel size itself; the instanced quads must match it
+    _draw_boxes(draw, _outline_like_width(ctx), ctx.preferences.system.pixel_size)
 
     gpu.state.blend_set('NONE')
 
@@ -536,22 +923,38 @@ def _cleanup_legacy_props():
 
 # -------------------- Handlers --------------------
 
-def _depsgraph_update_post(*_args):
+def _depsgraph_update_post(_scene=None, depsgraph=None):
     global _dg_version
     _dg_version += 1
+    # Local bounds only change with geometry; keep cached corners otherwise
+    try:
+        if depsgraph is None or any(u.is_updated_geometry for u in depsgraph.updates):
+            _clear_corner_caches()
+    except Exception:
+        _clear_corner_caches()
+
+def _frame_change_post(_scene=None, _depsgraph=None):
+    # Playback / scrubbing does not fire depsgraph_update_post, but animation,
+    # drivers and constraints can move boxes or change (animated) geometry
+    global _dg_version
+    _dg_version += 1
+    _clear_corner_caches()
 
 def _load_post(_dummy):
     # Clean legacy props and re-apply global state if saved ON
     _cleanup_legacy_props()
+    try:
+        _subscribe_theme()
+    except Exception:
+        pass
     try:
         enabled = bool(getattr(bpy.context.scene, "bbsel_enable_all", False))
         if enabled:
             _apply_everywhere(True)
     except Exception:
         pass
-    # Reset throttling so first draw happens immediately
-    global _last_update_time
-    _last_update_time = 0.0
+    # Force a recompute on the next tick; cached pointers belong to the old file
+    _caches.clear()
 
 
 # -------------------- Register --------------------
@@ -573,6 +976,11 @@ def register():
     )
 
     _overlay_targets = _append_to_overlay()
+    _init_shaders()
+    try:
+        _subscribe_theme()
+    except Exception:
+        pass
 
     if _draw_handle is None:
         _draw_handle = bpy.types.SpaceView3D.draw_handler_add(
@@ -581,9 +989,14 @@ def register():
 
     if _depsgraph_update_post not in bpy.app.handlers.depsgraph_update_post:
         bpy.app.handlers.depsgraph_update_post.append(_depsgraph_update_post)
+    if _frame_change_post not in bpy.app.handlers.frame_change_post:
+        bpy.app.handlers.frame_change_post.append(_frame_change_post)
     if _load_post not in bpy.app.handlers.load_post:
         bpy.app.handlers.load_post.append(_load_post)
 
+    if not bpy.app.timers.is_registered(_bbsel_tick):
+        bpy.app.timers.register(_bbsel_tick, first_interval=_interval(), persistent=True)
+
 def unregister():
     global _draw_handle, _overlay_targets
 
@@ -602,10 +1015,23 @@ def unregister():
         bpy.app.handlers.depsgraph_update_post.remove(_depsgraph_update_post)
     except Exception:
         pass
+    try:
+        bpy.app.handlers.frame_change_post.remove(_frame_change_post)
+    except Exception:
+        pass
     try:
         bpy.app.handlers.load_post.remove(_load_post)
     except Exception:
         pass
+    try:
+        if bpy.app.timers.is_registered(_bbsel_tick):
+            bpy.app.timers.unregister(_bbsel_tick)
+    except Exception:
+        pass
+    try:
+        bpy.msgbus.clear_by_owner(_theme_owner)
+    except Exception:
+        pass
 
     for cls in reversed(classes):
         try:
@@ -616,6 +1042,9 @@ def unregister():
     if hasattr(bpy.types.Scene, "bbsel_enable_all"):
         del bpy.types.Scene.bbsel_enable_all
 
+    _caches.clear()
+    _box_gpu.update(flat=None, shaders={}, template=None, failed=False)
+
 
 if __name__ == "__main__":
     register()